@@ -3,54 +3,65 @@
 Async Example AI Agent using Headlock Mode.
 
 This demonstrates an async AI agent using the headlock system.
+
+Install the package first (``pip install -e .``) so ``src`` is importable.
 """
 
 import asyncio
+import os
 import sys
 
-# Add parent to path for imports
-sys.path.insert(0, str(__file__).rsplit("/", 2)[0])
-
 from src.client import AsyncHeadlockClient
 
+# Seconds of simulated work per instruction (0 disables the delay)
+SIM_WORK_S = float(os.getenv("HEADLOCK_SIMULATE_WORK_S", "0"))
+
+
+def emit(*lines: str) -> None:
+    """Write several lines to stdout with a single write and flush."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 
 async def execute_task(instruction: str) -> str:
     """Simulate executing a task asynchronously."""
-    print(f"\n🤖 Executing: {instruction}")
-    
+    if not instruction:
+        return ""
+
     # Simulate async work
-    await asyncio.sleep(1)
+    if SIM_WORK_S:
+        await asyncio.sleep(SIM_WORK_S)
     
-    result = f"Completed: {instruction}"
-    print(f"✅ Result: {result}")
-    return result
+    return f"Completed: {instruction}"
 
 
 async def main():
     """Main async agent loop."""
     server_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8765"
     
+    client = AsyncHeadlockClient(server_url=server_url)
+    # Each continue_headlock call carries the previous task's result, so the
+    # round-trips themselves are sequential; what can overlap is the MCP
+    # handshake with the agent's own start-up work.
+    connecting = asyncio.create_task(client.connect())
+    
     print("🔒 Async Headlock Mode AI Agent")
     print(f"Connecting to: {server_url}\n")
     
-    client = AsyncHeadlockClient(server_url=server_url)
-    
     try:
+        await connecting
         print("📡 Entering headlock mode...")
-        response = await client.enter_headlock(
-            context="Async AI Agent ready."
-        )
         
-        print(f"📋 Session: {response.session_id[:8]}...")
-        
-        while not response.should_terminate:
-            if response.instruction:
-                result = await execute_task(response.instruction)
-                print("\n⏳ Waiting for next instruction...")
-                response = await client.continue_headlock(
-                    session_id=response.session_id,
-                    context=result
-                )
+        async for instruction, report in client.iter_instructions(
+            context="Async AI Agent ready."
+        ):
+            result = await execute_task(instruction)
+            emit(
+                f"\n🤖 Executed: {instruction}",
+                f"✅ Result: {result}",
+                "\n⏳ Waiting for next instruction...",
+            )
+            report(result)
         
         print("\n👋 Session ended by tap-out")
     
@@ -58,7 +69,14 @@ async def main():
         print("\n⚠️ Interrupted")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        await client.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
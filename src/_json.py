@@ -0,0 +1,41 @@
+"""JSON helpers backed by orjson when it is installed, stdlib json otherwise."""
+
+import json
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to UTF-8 encoded JSON."""
+        return orjson.dumps(obj)
+
+else:
+    loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+    def _default(obj: Any) -> Any:
+        # Match orjson, which serializes datetimes natively as RFC 3339
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string."""
+        return json.dumps(obj, indent=2 if indent else None, default=_default)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to UTF-8 encoded JSON."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
@@ -6,16 +6,34 @@ and communicate with the Headlock MCP server.
 """
 
 import asyncio
-import json
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import AsyncIterator, Callable, Iterable, Optional
 
 import httpx
 from mcp.client.session import ClientSession
 from mcp.client.streamable_http import streamable_http_client
+from mcp.shared.exceptions import McpError
 
+from . import _json
 
-@dataclass
+try:
+    import uvloop
+except ImportError:  # uvloop is an optional speedup (unavailable on Windows)
+    uvloop = None
+
+
+# Keep-alive pool shared by every call made through one client instance. The
+# client also speaks HTTP/2 when the server negotiates it (TLS + ALPN), so the
+# long-lived MCP stream and concurrent tool calls share one connection.
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# MCP tool names exposed by the headlock server
+_TOOL_ENTER = "headlock-enter_headlock"
+_TOOL_CONTINUE = "headlock-continue_headlock"
+
+
+@dataclass(slots=True, frozen=True)
 class HeadlockResponse:
     """Response from headlock operations."""
     session_id: str
@@ -23,49 +41,295 @@ class HeadlockResponse:
     should_terminate: bool = False
 
 
+def _unwrap_payload(data: dict) -> dict:
+    # FastMCP wraps non-dict tool return values as {"result": <value>}
+    if "session_id" not in data and isinstance(data.get("result"), str):
+        return _json.loads(data["result"])
+    return data
+
+
 def _parse_mcp_result(result) -> dict:
     # First try structured content
     if getattr(result, "structuredContent", None) is not None:
         content = result.structuredContent
         if isinstance(content, dict):
-            return content
+            return _unwrap_payload(content)
         # If it's a Pydantic model, convert to dict
         if hasattr(content, "model_dump"):
-            return content.model_dump()
+            return _unwrap_payload(content.model_dump())
         elif hasattr(content, "__dict__"):
-            return content.__dict__
+            return _unwrap_payload(content.__dict__)
     
     # Fall back to parsing text content
     for block in getattr(result, "content", []) or []:
         text = getattr(block, "text", None)
         if text:
             try:
-                return json.loads(text)
+                data = _json.loads(text)
             except Exception:
-                pass
+                continue
+            if isinstance(data, dict):
+                return _unwrap_payload(data)
     
     raise RuntimeError("Could not parse MCP result")
 
 
+def _structured_payload(result) -> dict:
+    data = result.structuredContent
+    if "session_id" not in data:
+        raise KeyError("session_id")
+    return data
+
+
+def _wrapped_structured_payload(result) -> dict:
+    # FastMCP wraps non-dict tool return values as {"result": <value>}
+    data = _json.loads(result.structuredContent["result"])
+    if "session_id" not in data:
+        raise KeyError("session_id")
+    return data
+
+
+def _error_text(result) -> str:
+    """The message of an error tool result."""
+    texts = [getattr(block, "text", None) for block in getattr(result, "content", []) or []]
+    return "; ".join(text for text in texts if text) or "unknown error"
+
+
+def _select_parser(result):
+    """Pick the cheapest parser for the shape of this tool result."""
+    content = getattr(result, "structuredContent", None)
+    if isinstance(content, dict):
+        if "session_id" in content:
+            return _structured_payload
+        if isinstance(content.get("result"), str):
+            return _wrapped_structured_payload
+    return _parse_mcp_result
+
+
+class AsyncHeadlockClient:
+    """Async version of HeadlockClient for async AI agents.
+
+    One pooled HTTP client and one initialized MCP session are shared by all
+    calls made through an instance; close() releases both. Run the agent with
+    ``uvloop.run(main())`` instead of ``asyncio.run`` for a faster event loop.
+    """
+
+    def __init__(self, server_url: str = "http://localhost:8765", timeout: float = None):
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+        self._mcp_url = f"{self.server_url}/mcp/"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._session_future: Optional[asyncio.Future] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_closed: Optional[asyncio.Event] = None
+        self._parser = None
+
+    async def _ensure_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=_POOL_LIMITS, http2=True)
+        return self._client
+
+    async def _open_session(self) -> tuple[asyncio.Task, asyncio.Future]:
+        """Start the MCP session if needed; return its owning task and readiness future."""
+        if self._session_task is not None and self._session_task.done():
+            await self._drop_session()
+        if self._session_future is None:
+            loop = asyncio.get_running_loop()
+            self._session_future = loop.create_future()
+            self._session_closed = asyncio.Event()
+            self._session_task = loop.create_task(
+                self._hold_session(self._session_future, self._session_closed)
+            )
+        return self._session_task, self._session_future
+
+    async def _get_session(self) -> ClientSession:
+        """Return the initialized MCP session, opening it on first use."""
+        _task, ready = await self._open_session()
+        return await asyncio.shield(ready)
+
+    async def _hold_session(self, ready: asyncio.Future, closed: asyncio.Event) -> None:
+        # The transport and the session run anyio task groups that must be
+        # entered and exited from the same task, so one task owns them.
+        try:
+            http_client = await self._ensure_client()
+            async with streamable_http_client(
+                self._mcp_url,
+                http_client=http_client,
+            ) as (read, write, _get_session_id):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    ready.set_result(session)
+                    await closed.wait()
+        except Exception as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+        finally:
+            if not ready.done():
+                ready.set_exception(ConnectionError("MCP session closed"))
+
+    async def _drop_session(self, owner: Optional[asyncio.Task] = None) -> None:
+        """
+        Close the cached MCP session so the next call opens a fresh one.
+        With owner, only if that task still holds the cached session, so a
+        late failure doesn't close a session opened after it.
+        """
+        if owner is not None and owner is not self._session_task:
+            return
+        task, self._session_task = self._session_task, None
+        self._session_future = None
+        if task is not None:
+            self._session_closed.set()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def connect(self) -> None:
+        """Open the MCP session ahead of the first call."""
+        await self._get_session()
+
+    async def close(self) -> None:
+        """Close the MCP session and release pooled connections."""
+        await self._drop_session()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncHeadlockClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _parse(self, result) -> dict:
+        """Parse a tool result, specializing on the first shape the server returns."""
+        if getattr(result, "isError", False):
+            # Error results carry a message, not a payload, so they never pick the parser
+            raise RuntimeError(f"Tool call failed: {_error_text(result)}")
+        parser = self._parser
+        if parser is not None:
+            try:
+                return parser(result)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                pass
+        parser = _select_parser(result)
+        data = parser(result)
+        self._parser = parser
+        return data
+
+    async def _call_tool(self, tool: str, args: dict, fallback_session_id: str) -> HeadlockResponse:
+        """Call a headlock tool on the shared session and build the response."""
+        # On error, return a response that terminates the session
+        failed = HeadlockResponse(
+            session_id=fallback_session_id,
+            instruction=None,
+            should_terminate=True,
+        )
+        owner = None
+        try:
+            owner, ready = await self._open_session()
+            session = await asyncio.shield(ready)
+            result = await session.call_tool(tool, args)
+        except McpError:
+            # The server rejected this request; the session still serves the others
+            return failed
+        except Exception:
+            # The transport failed, so the next call opens a fresh session.
+            # Tool errors don't get here: calls sharing the session stay intact.
+            await self._drop_session(owner)
+            return failed
+
+        try:
+            data = self._parse(result)
+        except Exception:
+            return failed
+        return HeadlockResponse(
+            session_id=data["session_id"],
+            instruction=data.get("instruction"),
+            should_terminate=data.get("should_terminate", False),
+        )
+
+    async def enter_headlock(
+        self,
+        session_id: Optional[str] = None,
+        context: Optional[str] = None,
+    ) -> HeadlockResponse:
+        return await self._call_tool(
+            _TOOL_ENTER,
+            {"session_id": session_id, "context": context},
+            session_id or "error",
+        )
+
+    async def continue_headlock(
+        self,
+        session_id: str,
+        context: Optional[str] = None,
+    ) -> HeadlockResponse:
+        return await self._call_tool(
+            _TOOL_CONTINUE,
+            {"session_id": session_id, "context": context},
+            session_id,
+        )
+
+    async def continue_headlock_many(
+        self,
+        items: Iterable[tuple[str, Optional[str]]],
+    ) -> list[HeadlockResponse]:
+        """Continue several sessions concurrently over the shared MCP session.
+
+        Args:
+            items: (session_id, context) pairs
+
+        Returns:
+            One response per pair, in the same order.
+        """
+        return list(await asyncio.gather(
+            *(self.continue_headlock(session_id, context) for session_id, context in items)
+        ))
+
+    async def iter_instructions(
+        self,
+        context: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> AsyncIterator[tuple[str, Callable[[str], None]]]:
+        """
+        Enter headlock mode and yield each instruction until the user taps out.
+
+        Each item is ``(instruction, report)``; call ``report(result)`` before
+        advancing to send the result back with the next continue call. Until a
+        new result is reported, the last one (or ``context``) is sent again, so
+        the agent's context on the server isn't cleared.
+
+        Usage:
+            async for instruction, report in client.iter_instructions(context="ready"):
+                report(await execute_task(instruction))
+        """
+        response = await self.enter_headlock(session_id=session_id, context=context)
+        while not response.should_terminate:
+            results: list[str] = []
+            if response.instruction:
+                yield response.instruction, results.append
+            if results:
+                context = results[-1]
+            response = await self.continue_headlock(response.session_id, context=context)
+
+
 class HeadlockClient:
     """
     Client for AI agents to interact with the Headlock MCP server.
     
     Usage:
-        client = HeadlockClient("http://localhost:8765")
-        
-        # Enter headlock mode - blocks until user sends instruction
-        response = client.enter_headlock()
-        
-        while not response.should_terminate:
-            # Execute the instruction
-            result = execute_task(response.instruction)
+        with HeadlockClient("http://localhost:8765") as client:
+            # Enter headlock mode - blocks until user sends instruction
+            response = client.enter_headlock()
             
-            # Report back and wait for next instruction
-            response = client.continue_headlock(
-                session_id=response.session_id,
-                context=result
-            )
+            while not response.should_terminate:
+                # Execute the instruction
+                result = execute_task(response.instruction)
+                
+                # Report back and wait for next instruction
+                response = client.continue_headlock(
+                    session_id=response.session_id,
+                    context=result
+                )
         
         print("Session ended by user tap-out")
     """
@@ -78,156 +342,50 @@ class HeadlockClient:
             server_url: URL of the Headlock MCP server
             timeout: Request timeout in seconds (None for infinite wait)
         """
-        self.server_url = server_url.rstrip("/")
+        self._async = AsyncHeadlockClient(server_url, timeout)
+        self.server_url = self._async.server_url
         self.timeout = timeout
-    
+        # One event loop for the client's lifetime, so the MCP session and the
+        # connection pool survive between the blocking calls below.
+        self._loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+
+    def _run(self, coro):
+        """Run a coroutine on the client's loop and block for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the MCP session, release pooled connections and stop the loop."""
+        if self._loop.is_closed():
+            return
+        self._run(self._async.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "HeadlockClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def enter_headlock(
         self,
         session_id: Optional[str] = None,
         context: Optional[str] = None,
     ) -> HeadlockResponse:
-        return asyncio.run(self._enter_headlock_async(session_id=session_id, context=context))
+        return self._run(self._async.enter_headlock(session_id=session_id, context=context))
 
-    async def _enter_headlock_async(
-        self,
-        session_id: Optional[str] = None,
-        context: Optional[str] = None,
-    ) -> HeadlockResponse:
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as http_client:
-                async with streamable_http_client(
-                    f"{self.server_url}/mcp/",
-                    http_client=http_client,
-                ) as (read, write, _get_session_id):
-                    session = ClientSession(read, write)
-                    await session.initialize()
-                    result = await session.call_tool(
-                        "headlock-enter_headlock",
-                        {"session_id": session_id, "context": context},
-                    )
-
-            data = _parse_mcp_result(result)
-            return HeadlockResponse(
-                session_id=data["session_id"],
-                instruction=data.get("instruction"),
-                should_terminate=data.get("should_terminate", False),
-            )
-        except Exception:
-            # On error, return a response that terminates the session
-            return HeadlockResponse(
-                session_id=session_id or "error",
-                instruction=None,
-                should_terminate=True,
-            )
-    
     def continue_headlock(
         self,
         session_id: str,
         context: Optional[str] = None,
     ) -> HeadlockResponse:
-        return asyncio.run(self._continue_headlock_async(session_id=session_id, context=context))
-
-    async def _continue_headlock_async(
-        self,
-        session_id: str,
-        context: Optional[str] = None,
-    ) -> HeadlockResponse:
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as http_client:
-                async with streamable_http_client(
-                    f"{self.server_url}/mcp/",
-                    http_client=http_client,
-                ) as (read, write, _get_session_id):
-                    session = ClientSession(read, write)
-                    await session.initialize()
-                    result = await session.call_tool(
-                        "headlock-continue_headlock",
-                        {"session_id": session_id, "context": context},
-                    )
-
-            data = _parse_mcp_result(result)
-            return HeadlockResponse(
-                session_id=data["session_id"],
-                instruction=data.get("instruction"),
-                should_terminate=data.get("should_terminate", False),
-            )
-        except Exception:
-            # On error, return a response that terminates the session
-            return HeadlockResponse(
-                session_id=session_id,
-                instruction=None,
-                should_terminate=True,
-            )
-
+        return self._run(self._async.continue_headlock(session_id=session_id, context=context))
 
-# Async version for use with async AI agents
-class AsyncHeadlockClient:
-    """Async version of HeadlockClient for async AI agents."""
-    
-    def __init__(self, server_url: str = "http://localhost:8765", timeout: float = None):
-        self.server_url = server_url.rstrip("/")
-        self.timeout = timeout
-    
-    async def enter_headlock(
+    def continue_headlock_many(
         self,
-        session_id: Optional[str] = None,
-        context: Optional[str] = None,
-    ) -> HeadlockResponse:
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as http_client:
-                async with streamable_http_client(
-                    f"{self.server_url}/mcp/",
-                    http_client=http_client,
-                ) as (read, write, _get_session_id):
-                    session = ClientSession(read, write)
-                    await session.initialize()
-                    result = await session.call_tool(
-                        "headlock-enter_headlock",
-                        {"session_id": session_id, "context": context},
-                    )
-
-            data = _parse_mcp_result(result)
-            return HeadlockResponse(
-                session_id=data["session_id"],
-                instruction=data.get("instruction"),
-                should_terminate=data.get("should_terminate", False),
-            )
-        except Exception:
-            # On error, return a response that terminates the session
-            return HeadlockResponse(
-                session_id=session_id or "error",
-                instruction=None,
-                should_terminate=True,
-            )
-    
-    async def continue_headlock(
-        self,
-        session_id: str,
-        context: Optional[str] = None,
-    ) -> HeadlockResponse:
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as http_client:
-                async with streamable_http_client(
-                    f"{self.server_url}/mcp/",
-                    http_client=http_client,
-                ) as (read, write, _get_session_id):
-                    session = ClientSession(read, write)
-                    await session.initialize()
-                    result = await session.call_tool(
-                        "headlock-continue_headlock",
-                        {"session_id": session_id, "context": context},
-                    )
-
-            data = _parse_mcp_result(result)
-            return HeadlockResponse(
-                session_id=data["session_id"],
-                instruction=data.get("instruction"),
-                should_terminate=data.get("should_terminate", False),
-            )
-        except Exception:
-            # On error, return a response that terminates the session
-            return HeadlockResponse(
-                session_id=session_id,
-                instruction=None,
-                should_terminate=True,
-            )
+        items: Iterable[tuple[str, Optional[str]]],
+    ) -> list[HeadlockResponse]:
+        return self._run(self._async.continue_headlock_many(items))
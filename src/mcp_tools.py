@@ -1,48 +1,54 @@
 """MCP Tools definition for AI agent integration."""
 
-import json
 from typing import Any
 
+from . import _json
+
+
+_TOOLS_SCHEMA: list[dict[str, Any]] = [
+    {
+        "name": "headlock-enter_headlock",
+        "description": "Enter headlock mode - block indefinitely waiting for instructions from the UI",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID (optional - new session created if not provided)"
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "headlock-continue_headlock",
+        "description": "Continue headlock - send context and wait for next instruction",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID (required)"
+                },
+                "context": {
+                    "type": "string",
+                    "description": "Context/summary from completed instruction"
+                }
+            },
+            "required": ["session_id"]
+        }
+    }
+]
+
 
 def get_mcp_tools_schema() -> list[dict[str, Any]]:
     """
     Returns the MCP tools schema for AI agent integration.
     These tools allow AI agents to enter and maintain headlock mode.
+
+    The schema is built once at import time and shared; treat it as read-only.
     """
-    return [
-        {
-            "name": "headlock-enter_headlock",
-            "description": "Enter headlock mode - block indefinitely waiting for instructions from the UI",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session ID (optional - new session created if not provided)"
-                    }
-                },
-                "required": []
-            }
-        },
-        {
-            "name": "headlock-continue_headlock",
-            "description": "Continue headlock - send context and wait for next instruction",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session ID (required)"
-                    },
-                    "context": {
-                        "type": "string",
-                        "description": "Context/summary from completed instruction"
-                    }
-                },
-                "required": ["session_id"]
-            }
-        }
-    ]
+    return _TOOLS_SCHEMA
 
 
 # MCP Server manifest for tool discovery
@@ -54,6 +60,9 @@ MCP_MANIFEST = {
 }
 
 
+_MANIFEST_JSON = _json.dumps(MCP_MANIFEST, indent=True)
+
+
 def format_mcp_manifest() -> str:
     """Return formatted MCP manifest as JSON string."""
-    return json.dumps(MCP_MANIFEST, indent=2)
+    return _MANIFEST_JSON
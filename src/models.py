@@ -1,9 +1,11 @@
 """Data models for the Headlock MCP server."""
 
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
+import time
 import uuid
 
 
@@ -15,18 +17,54 @@ class SessionState(str, Enum):
     TERMINATED = "terminated"  # Session was terminated by tap-out
 
 
-class HeadlockSession(BaseModel):
+def ns_to_datetime(ns: int) -> datetime:
+    """Convert a ``time.time_ns()`` timestamp to an aware UTC datetime."""
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=remainder // 1000)
+
+
+# Models built only from trusted in-process state are plain slotted dataclasses;
+# Pydantic models are kept for bodies that cross the HTTP boundary.
+
+@dataclass(slots=True)
+class HeadlockSession:
     """Represents an active headlock session."""
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
     state: SessionState = SessionState.WAITING
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at_ns: int = field(default_factory=time.time_ns)  # Epoch nanoseconds
+    updated_at_ns: int = 0  # Defaults to created_at_ns
     agent_context: Optional[str] = None  # Context from the AI agent
-    pending_instruction: Optional[str] = None  # Instruction from user
     last_response: Optional[str] = None  # Last response from AI
-    metadata: dict[str, Any] = Field(default_factory=dict)
+    metadata: dict[str, Any] = field(default_factory=dict)
+    # update_type -> pre-encoded broadcast envelope, up to the context value
+    envelopes: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not self.updated_at_ns:
+            self.updated_at_ns = self.created_at_ns
+
+    # Timestamps are kept as integers on the hot path and only turned into
+    # datetimes when a session is serialized.
+    @property
+    def created_at(self) -> datetime:
+        return ns_to_datetime(self.created_at_ns)
+
+    @property
+    def updated_at(self) -> datetime:
+        return ns_to_datetime(self.updated_at_ns)
+
+    def to_public_dict(self) -> dict[str, Any]:
+        """Summary sent to terminals; the JSON encoder formats created_at."""
+        return {
+            "session_id": self.session_id,
+            "state": self.state.value,
+            "context": self.agent_context,
+            "created_at": self.created_at,
+        }
 
 
+# No longer built by the server (the tools return plain dicts); kept as a
+# Pydantic model for code outside this package that imports it.
 class EnterHeadlockResponse(BaseModel):
     """Response when AI enters headlock mode."""
     session_id: str
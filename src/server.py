@@ -1,21 +1,23 @@
 """FastAPI server for Headlock MCP."""
 
 import asyncio
-import json
+import os
 from contextlib import asynccontextmanager
 from typing import Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
+from . import _json
 from .models import (
-    EnterHeadlockResponse,
+    HeadlockSession,
     SendInstructionRequest,
     SendInstructionResponse,
     SessionInfoResponse,
-    SessionState,
 )
 from .session_manager import session_manager
 
@@ -40,46 +42,124 @@ INSTRUCTION EXECUTION PROTOCOL:
 )
 
 
-# Track active WebSocket connections
-active_websockets: dict[str, set[WebSocket]] = {}
+class DefaultResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        return _json.dumps_bytes(content)
+
+
+# Track active WebSocket connections. Buckets are immutable tuples replaced on
+# every subscribe/unsubscribe, so broadcasts iterate a stable snapshot while
+# the websocket handlers connect and disconnect.
+active_websockets: dict[str, tuple[WebSocket, ...]] = {}
+
+
+def _subscribe(key: str, websocket: WebSocket) -> None:
+    """Add a connection to a bucket."""
+    active_websockets[key] = active_websockets.get(key, ()) + (websocket,)
+
+
+def _discard_websockets(key: str, websockets) -> None:
+    """Remove connections from a bucket, dropping the bucket once it is empty."""
+    bucket = active_websockets.get(key)
+    if bucket:
+        remaining = tuple(ws for ws in bucket if ws not in websockets)
+        if remaining:
+            active_websockets[key] = remaining
+        else:
+            del active_websockets[key]
+
+
+# Queues feeding the /sessions/stream server-sent event connections; like the
+# global websocket bucket, each one receives every session's updates.
+event_streams: set[asyncio.Queue] = set()
+
+
+def has_listeners(session_id: str) -> bool:
+    """Whether any terminal would receive a broadcast for this session."""
+    return bool(event_streams or active_websockets.get(session_id) or active_websockets.get("global"))
+
+
+def _terminal_targets(session_id: str) -> tuple[WebSocket, ...]:
+    """Session-specific connections plus global listeners (session_id = "global")."""
+    targets = active_websockets.get(session_id, ())
+    if session_id != "global":
+        listeners = active_websockets.get("global", ())
+        if targets and listeners:
+            # A socket in both buckets is only sent to once
+            targets = tuple(dict.fromkeys(targets + listeners))
+        else:
+            targets = targets or listeners
+    return targets
+
+
+async def _send_to_terminals(session_id: str, targets: tuple[WebSocket, ...], message: str):
+    """Send an encoded message to terminals, pruning connections that failed."""
+    for queue in tuple(event_streams):
+        if not queue.full():  # A stalled stream misses updates rather than buffering them
+            queue.put_nowait(message)
+    if not targets:
+        return
+    
+    # Send to every terminal concurrently; one slow socket doesn't hold up the
+    # rest. All sends share one ASGI frame instead of send_text() building one each.
+    frame = {"type": "websocket.send", "text": message}
+    results = await asyncio.gather(
+        *(ws.send(frame) for ws in targets),
+        return_exceptions=True,
+    )
+    
+    dead_connections = [ws for ws, result in zip(targets, results) if isinstance(result, Exception)]
+    if dead_connections:
+        for key in {session_id, "global"}:
+            _discard_websockets(key, dead_connections)
 
 
 async def broadcast_to_terminals(session_id: str, update_type: str, data: dict):
     """Broadcast updates to all connected terminals for a session."""
-    message = json.dumps({
+    targets = _terminal_targets(session_id)
+    if not targets and not event_streams:
+        return
+    
+    message = _json.dumps({
         "type": update_type,
         "session_id": session_id,
         "data": data
     })
+    await _send_to_terminals(session_id, targets, message)
+
+
+async def broadcast_context(session: HeadlockSession, update_type: str, context: Optional[str], **fields):
+    """Broadcast an update whose only per-call field is the agent's context.
+
+    The envelope around the context is encoded once per session and update
+    type, so each call only serializes the context string itself.
+    """
+    targets = _terminal_targets(session.session_id)
+    if not targets and not event_streams:
+        return
     
-    # Broadcast to session-specific connections
-    if session_id in active_websockets:
-        dead_connections = set()
-        for ws in active_websockets[session_id]:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead_connections.add(ws)
-        active_websockets[session_id] -= dead_connections
-    
-    # Broadcast to global listeners (session_id = "global")
-    if "global" in active_websockets:
-        dead_connections = set()
-        for ws in active_websockets["global"]:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead_connections.add(ws)
-        active_websockets["global"] -= dead_connections
+    prefix = session.envelopes.get(update_type)
+    if prefix is None:
+        envelope = _json.dumps({
+            "type": update_type,
+            "session_id": session.session_id,
+            "data": {"session_id": session.session_id, **fields},
+        })
+        # Reopen the trailing "}}" so the context becomes the last data field
+        prefix = session.envelopes[update_type] = envelope[:-2] + ',"context":'
+    await _send_to_terminals(session.session_id, targets, prefix + _json.dumps(context) + "}}")
+
+
+session_manager.register_broadcast_callback(broadcast_to_terminals)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
-    session_manager.register_broadcast_callback(broadcast_to_terminals)
-
-    # FastMCP's Streamable HTTP transport needs its background task group started.
-    mcp.streamable_http_app()
+    # FastMCP's Streamable HTTP transport needs its background task group started;
+    # its session manager was created when mcp_http_app was built below.
     async with mcp.session_manager.run():
         yield
 
@@ -89,12 +169,30 @@ app = FastAPI(
     description="MCP server for AI agent headlock mode - enables user control over AI execution flow",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=DefaultResponse,
 )
 
+class SessionsGZipMiddleware(GZipMiddleware):
+    """Compress the /sessions endpoints only; event streams and websockets pass through."""
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] == "http" and path.startswith("/sessions") and path != "/sessions/stream":
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+# Comma-separated list of allowed origins. The "*" default can't be combined
+# with credentials, which also lets Starlette answer with a static header
+# instead of echoing each request's Origin.
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",") if o.strip()]
+
+app.add_middleware(SessionsGZipMiddleware, minimum_size=1024)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=ALLOWED_ORIGINS != ["*"],
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -104,7 +202,7 @@ app.add_middleware(
 # Headlock Core Logic
 # ============================================================================
 
-async def _enter_headlock(session_id: Optional[str], context: Optional[str]) -> EnterHeadlockResponse:
+async def _enter_headlock(session_id: Optional[str], context: Optional[str]) -> dict:
     """Enter headlock mode and block until an instruction or tap-out."""
     session = session_manager.get_session(session_id) if session_id else None
 
@@ -113,23 +211,19 @@ async def _enter_headlock(session_id: Optional[str], context: Optional[str]) ->
     else:
         session_manager.update_context(session.session_id, context or "")
 
-    await broadcast_to_terminals(session.session_id, "session_waiting", {
-        "session_id": session.session_id,
-        "context": context,
-        "created_at": session.created_at.isoformat(),
-    })
+    if has_listeners(session.session_id):
+        await broadcast_context(session, "session_waiting", context, created_at=session.created_at)
 
     instruction, should_terminate = await session_manager.wait_for_instruction(session.session_id, timeout=3600)
 
-    return EnterHeadlockResponse(
-        session_id=session.session_id,
-        instruction=instruction,
-        should_terminate=should_terminate,
-        next_action="Execute the instruction using all available tools (read files, run commands, analyze code, edit files, etc.), respond conversationally with the results, then call headlock-continue_headlock to get the next instruction." if instruction and not should_terminate else None,
-    )
+    return {
+        "session_id": session.session_id,
+        "instruction": instruction,
+        "should_terminate": should_terminate,
+    }
 
 
-async def _continue_headlock(session_id: str, context: Optional[str]) -> EnterHeadlockResponse:
+async def _continue_headlock(session_id: str, context: Optional[str]) -> dict:
     """Continue headlock after a task result and block for the next instruction."""
     session = session_manager.get_session(session_id)
     if not session:
@@ -137,19 +231,16 @@ async def _continue_headlock(session_id: str, context: Optional[str]) -> EnterHe
 
     session_manager.update_context(session_id, context or "")
 
-    await broadcast_to_terminals(session_id, "task_completed", {
-        "session_id": session_id,
-        "context": context,
-    })
+    if has_listeners(session_id):
+        await broadcast_context(session, "task_completed", context)
 
     instruction, should_terminate = await session_manager.wait_for_instruction(session_id, timeout=3600)
 
-    return EnterHeadlockResponse(
-        session_id=session_id,
-        instruction=instruction,
-        should_terminate=should_terminate,
-        next_action="Execute the instruction using all available tools (read files, run commands, analyze code, edit files, etc.), respond conversationally with the results, then call headlock-continue_headlock to get the next instruction." if instruction and not should_terminate else None,
-    )
+    return {
+        "session_id": session_id,
+        "instruction": instruction,
+        "should_terminate": should_terminate,
+    }
 
 
 # ============================================================================
@@ -161,12 +252,7 @@ async def _continue_headlock(session_id: str, context: Optional[str]) -> EnterHe
     description="GET FIRST INSTRUCTION. Call this to start execution loop. Returns instruction. Then USE ALL AVAILABLE TOOLS to execute it completely (read files, run commands, analyze code, edit files, etc.), respond conversationally with results, then call continue_headlock.",
 )
 async def mcp_enter_headlock(session_id: Optional[str] = None, context: Optional[str] = None) -> str:
-    response = await _enter_headlock(session_id, context)
-    return json.dumps({
-        "session_id": response.session_id,
-        "instruction": response.instruction,
-        "should_terminate": response.should_terminate,
-    })
+    return _json.dumps(await _enter_headlock(session_id, context))
 
 
 @mcp.tool(
@@ -174,16 +260,12 @@ async def mcp_enter_headlock(session_id: Optional[str] = None, context: Optional
     description="GET NEXT INSTRUCTION. Call this AFTER responding conversationally with execution results. Gets the next instruction to execute.",
 )
 async def mcp_continue_headlock(session_id: str, context: Optional[str] = None) -> str:
-    response = await _continue_headlock(session_id, context)
-    return json.dumps({
-        "session_id": response.session_id,
-        "instruction": response.instruction,
-        "should_terminate": response.should_terminate,
-    })
+    return _json.dumps(await _continue_headlock(session_id, context))
 
 
-# Mount the MCP Streamable HTTP server at /mcp
-app.mount("/mcp", mcp.streamable_http_app())
+# Mount the MCP Streamable HTTP server at /mcp (built once, at import)
+mcp_http_app = mcp.streamable_http_app()
+app.mount("/mcp", mcp_http_app)
 
 
 # ============================================================================
@@ -191,37 +273,41 @@ app.mount("/mcp", mcp.streamable_http_app())
 # ============================================================================
 
 @app.get("/sessions", response_model=list[SessionInfoResponse])
-async def list_sessions():
-    """List all active headlock sessions."""
-    sessions = session_manager.get_all_sessions()
-    return [
-        SessionInfoResponse(
-            session_id=s.session_id,
-            state=s.state,
-            created_at=s.created_at,
-            updated_at=s.updated_at,
-            agent_context=s.agent_context,
-            last_response=s.last_response,
-        )
-        for s in sessions
-    ]
+async def list_sessions(prefix: Optional[str] = None):
+    """List all active headlock sessions, or those whose ID starts with prefix."""
+    if prefix:
+        sessions = session_manager.find_sessions(prefix)
+    else:
+        sessions = session_manager.iter_sessions()
+    return DefaultResponse([session_manager.get_session_info(s) for s in sessions])
 
 
 @app.get("/sessions/waiting", response_model=list[SessionInfoResponse])
 async def list_waiting_sessions():
     """List sessions waiting for user input."""
     sessions = session_manager.get_waiting_sessions()
-    return [
-        SessionInfoResponse(
-            session_id=s.session_id,
-            state=s.state,
-            created_at=s.created_at,
-            updated_at=s.updated_at,
-            agent_context=s.agent_context,
-            last_response=s.last_response,
-        )
-        for s in sessions
-    ]
+    return DefaultResponse([session_manager.get_session_info(s) for s in sessions])
+
+
+@app.get("/sessions/stream")
+async def stream_sessions():
+    """
+    Stream session updates as server-sent events.
+    The first event is the initial_state snapshot; every later event is the
+    same message the websocket terminals receive.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+    
+    async def events():
+        event_streams.add(queue)
+        try:
+            yield f"data: {_initial_state_frame()}\n\n"
+            while True:
+                yield f"data: {await queue.get()}\n\n"
+        finally:
+            event_streams.discard(queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @app.get("/sessions/{session_id}", response_model=SessionInfoResponse)
@@ -231,59 +317,48 @@ async def get_session(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return SessionInfoResponse(
-        session_id=session.session_id,
-        state=session.state,
-        created_at=session.created_at,
-        updated_at=session.updated_at,
-        agent_context=session.agent_context,
-        last_response=session.last_response,
-    )
+    return DefaultResponse(session_manager.get_session_info(session))
 
 
 @app.post("/sessions/{session_id}/instruct", response_model=SendInstructionResponse)
 async def send_instruction(session_id: str, request: SendInstructionRequest):
     """Send an instruction to a waiting AI agent."""
-    session = session_manager.get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    success, error = session_manager.send_instruction_checked(session_id, request.instruction)
     
-    if session.state != SessionState.WAITING:
+    if error == "not_found":
+        raise HTTPException(status_code=404, detail="Session not found")
+    if error == "not_waiting":
+        session = session_manager.get_session(session_id)
         raise HTTPException(
             status_code=400, 
             detail=f"Session is not waiting for input (state: {session.state})"
         )
     
-    success = session_manager.send_instruction(session_id, request.instruction)
-    
-    if success:
+    if has_listeners(session_id):
         await broadcast_to_terminals(session_id, "instruction_sent", {
             "instruction": request.instruction,
         })
     
     return SendInstructionResponse(
         success=success,
-        message="Instruction sent" if success else "Failed to send instruction",
+        message="Instruction sent",
     )
 
 
 @app.post("/sessions/{session_id}/tap-out", response_model=SendInstructionResponse)
 async def tap_out(session_id: str):
     """Signal the AI to terminate the session (tap out)."""
-    session = session_manager.get_session(session_id)
-    if not session:
+    if not session_manager.tap_out(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    success = session_manager.tap_out(session_id)
-    
-    if success:
+    if has_listeners(session_id):
         await broadcast_to_terminals(session_id, "session_terminated", {
             "reason": "tap_out",
         })
     
     return SendInstructionResponse(
-        success=success,
-        message="Tap out signal sent" if success else "Failed to send tap out",
+        success=True,
+        message="Tap out signal sent",
     )
 
 
@@ -293,6 +368,10 @@ async def delete_session(session_id: str):
     success = session_manager.remove_session(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
+    
+    if has_listeners(session_id):
+        await broadcast_to_terminals(session_id, "session_removed", {})
+    
     return {"success": True, "message": "Session removed"}
 
 
@@ -300,53 +379,78 @@ async def delete_session(session_id: str):
 # WebSocket for Real-time Terminal Updates
 # ============================================================================
 
+async def _handle_terminal_commands(data: str, session_id: Optional[str] = None) -> None:
+    """
+    Apply the commands in one websocket frame.
+
+    A frame holds a single command object or a JSON array of them, so a
+    terminal can flush a burst of commands in one frame and one wakeup.
+    Session-scoped sockets pass their session_id, which overrides the
+    message's own.
+    """
+    messages = _json.loads(data)
+    if isinstance(messages, dict):
+        messages = (messages,)
+    
+    for message in messages:
+        target = session_id or message.get("session_id")
+        if not target:
+            continue
+        
+        # Broadcast like the HTTP endpoints, so terminals that stop polling
+        # while connected still see the change
+        if message.get("type") == "instruct":
+            instruction = message.get("instruction")
+            if instruction and session_manager.send_instruction(target, instruction):
+                if has_listeners(target):
+                    await broadcast_to_terminals(target, "instruction_sent", {
+                        "instruction": instruction,
+                    })
+        
+        elif message.get("type") == "tap_out":
+            if session_manager.tap_out(target) and has_listeners(target):
+                await broadcast_to_terminals(target, "session_terminated", {
+                    "reason": "tap_out",
+                })
+
+
+# (session_manager.revision, encoded initial_state frame)
+_initial_state_cache: tuple[int, str] = (-1, "")
+
+
+def _initial_state_frame() -> str:
+    """Encode the initial_state frame, reused until any session changes."""
+    global _initial_state_cache
+    revision, frame = _initial_state_cache
+    if revision != session_manager.revision:
+        sessions = session_manager.iter_sessions()
+        frame = _json.dumps({
+            "type": "initial_state",
+            "data": {"sessions": [s.to_public_dict() for s in sessions]},
+        })
+        _initial_state_cache = (session_manager.revision, frame)
+    return frame
+
+
 @app.websocket("/ws")
 async def websocket_global(websocket: WebSocket):
     """Global WebSocket connection for monitoring all sessions."""
     await websocket.accept()
     
-    if "global" not in active_websockets:
-        active_websockets["global"] = set()
-    active_websockets["global"].add(websocket)
+    _subscribe("global", websocket)
     
     try:
         # Send current sessions on connect
-        sessions = session_manager.get_all_sessions()
-        await websocket.send_text(json.dumps({
-            "type": "initial_state",
-            "data": {
-                "sessions": [
-                    {
-                        "session_id": s.session_id,
-                        "state": s.state.value,
-                        "context": s.agent_context,
-                        "created_at": s.created_at.isoformat(),
-                    }
-                    for s in sessions
-                ]
-            }
-        }))
+        await websocket.send_text(_initial_state_frame())
         
+        # Handle terminal commands via WebSocket
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            # Handle terminal commands via WebSocket
-            if message.get("type") == "instruct":
-                session_id = message.get("session_id")
-                instruction = message.get("instruction")
-                if session_id and instruction:
-                    session_manager.send_instruction(session_id, instruction)
-            
-            elif message.get("type") == "tap_out":
-                session_id = message.get("session_id")
-                if session_id:
-                    session_manager.tap_out(session_id)
+            await _handle_terminal_commands(await websocket.receive_text())
     
     except WebSocketDisconnect:
-        active_websockets["global"].discard(websocket)
+        _discard_websockets("global", (websocket,))
     except Exception:
-        active_websockets["global"].discard(websocket)
+        _discard_websockets("global", (websocket,))
 
 
 @app.websocket("/ws/{session_id}")
@@ -354,40 +458,29 @@ async def websocket_session(websocket: WebSocket, session_id: str):
     """WebSocket connection for a specific session."""
     await websocket.accept()
     
-    if session_id not in active_websockets:
-        active_websockets[session_id] = set()
-    active_websockets[session_id].add(websocket)
+    _subscribe(session_id, websocket)
     
     try:
         # Send current session state on connect
         session = session_manager.get_session(session_id)
         if session:
-            await websocket.send_text(json.dumps({
+            await websocket.send_text(_json.dumps({
                 "type": "session_state",
                 "session_id": session_id,
                 "data": {
                     "state": session.state.value,
                     "context": session.agent_context,
-                    "created_at": session.created_at.isoformat(),
+                    "created_at": session.created_at,
                 }
             }))
         
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            if message.get("type") == "instruct":
-                instruction = message.get("instruction")
-                if instruction:
-                    session_manager.send_instruction(session_id, instruction)
-            
-            elif message.get("type") == "tap_out":
-                session_manager.tap_out(session_id)
+            await _handle_terminal_commands(await websocket.receive_text(), session_id)
     
     except WebSocketDisconnect:
-        active_websockets[session_id].discard(websocket)
+        _discard_websockets(session_id, (websocket,))
     except Exception:
-        active_websockets[session_id].discard(websocket)
+        _discard_websockets(session_id, (websocket,))
 
 
 @app.get("/", include_in_schema=False)
@@ -403,19 +496,27 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "active_sessions": len(session_manager.get_all_sessions()),
-        "waiting_sessions": len(session_manager.get_waiting_sessions()),
+        "active_sessions": session_manager.session_count(),
+        "waiting_sessions": session_manager.waiting_count(),
     }
 
 
 def main():
     """Run the server."""
     import uvicorn
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 where they aren't (e.g. uvloop on Windows).
+    # Auto-reload is opt-in since it runs the app under a file-watching supervisor.
     uvicorn.run(
         "src.server:app",
-        host="0.0.0.0",
-        port=8765,
-        reload=True,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8765")),
+        loop="auto",
+        http="auto",
+        # Sessions, their inboxes and the websocket registry live in this process,
+        # so an agent and the terminal driving it must reach the same worker.
+        workers=1,
+        reload=os.getenv("HEADLOCK_RELOAD") == "1",
     )
 
 
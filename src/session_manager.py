@@ -1,19 +1,61 @@
 """Session manager for Headlock MCP server."""
 
 import asyncio
-from datetime import datetime
-from typing import Optional
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
 from .models import HeadlockSession, SessionState
 
 
+@dataclass(slots=True)
+class _Slot:
+    """Everything the manager keeps for one session, behind a single lookup."""
+    session: HeadlockSession
+    # Holds at most one (instruction, should_terminate) result for the agent's
+    # next wait_for_instruction
+    inbox: asyncio.Queue
+    info: Optional[dict] = None  # JSON-ready session info, until the session next changes
+
+
 class SessionManager:
     """Manages headlock sessions and synchronization between AI and terminal."""
     
     def __init__(self):
-        self._sessions: dict[str, HeadlockSession] = {}
-        self._instruction_events: dict[str, asyncio.Event] = {}
+        self._slots: dict[str, _Slot] = {}
+        self._sorted_ids: list[str] = []  # Session ids in sorted order, for prefix lookups
         self._terminal_connections: dict[str, set] = {}  # session_id -> set of websocket connections
         self._broadcast_callbacks: list = []
+        # Ids of WAITING sessions, in the order they started waiting (a dict as an ordered set)
+        self._waiting: dict[str, None] = {}
+        self.revision = 0  # Bumped on every session change, for callers caching views
+    
+    def _touch(self, slot: _Slot) -> None:
+        """Record a change to a session: bump updated_at and drop its cached info."""
+        session = slot.session
+        session.updated_at_ns = max(time.time_ns(), session.updated_at_ns + 1)
+        slot.info = None
+        self.revision += 1
+    
+    def _set_state(self, slot: _Slot, state: SessionState) -> None:
+        """Change a session's state, keeping the waiting index in step."""
+        if state == SessionState.WAITING:
+            self._waiting[slot.session.session_id] = None
+        else:
+            self._waiting.pop(slot.session.session_id, None)
+        slot.session.state = state
+        self._touch(slot)
+    
+    @staticmethod
+    def _deliver(slot: _Slot, message: tuple[Optional[str], bool]) -> None:
+        """Put a result in a session's inbox, replacing an undelivered instruction."""
+        inbox = slot.inbox
+        if inbox.full():
+            pending = inbox.get_nowait()
+            if pending[1]:
+                # A termination is never overridden by a later instruction
+                message = pending
+        inbox.put_nowait(message)
     
     def create_session(self, session_id: Optional[str] = None, context: Optional[str] = None) -> HeadlockSession:
         """Create a new headlock session."""
@@ -21,121 +63,171 @@ class SessionManager:
         if session_id:
             session.session_id = session_id
         
-        self._sessions[session.session_id] = session
-        self._instruction_events[session.session_id] = asyncio.Event()
+        if session.state == SessionState.WAITING:
+            self._waiting[session.session_id] = None
+        else:
+            self._waiting.pop(session.session_id, None)
+        
+        replaced = self._slots.get(session.session_id)
+        if replaced is None:
+            bisect.insort(self._sorted_ids, session.session_id)
+        else:
+            # An agent still parked on the replaced session is told to stop
+            self._deliver(replaced, (None, True))
+        self._slots[session.session_id] = _Slot(session, asyncio.Queue(maxsize=1))
+        self.revision += 1
         return session
     
     def get_session(self, session_id: str) -> Optional[HeadlockSession]:
         """Get a session by ID."""
-        return self._sessions.get(session_id)
+        slot = self._slots.get(session_id)
+        return slot.session if slot else None
     
     def get_all_sessions(self) -> list[HeadlockSession]:
         """Get all active sessions."""
-        return list(self._sessions.values())
+        return [slot.session for slot in self._slots.values()]
+    
+    def iter_sessions(self) -> Iterator[HeadlockSession]:
+        """Iterate over active sessions without copying them into a list."""
+        return (slot.session for slot in self._slots.values())
+    
+    def find_sessions(self, prefix: str) -> list[HeadlockSession]:
+        """Get the sessions whose ID starts with prefix, in ID order."""
+        ids = self._sorted_ids
+        matches = []
+        for i in range(bisect.bisect_left(ids, prefix), len(ids)):
+            if not ids[i].startswith(prefix):
+                break
+            matches.append(self._slots[ids[i]].session)
+        return matches
     
     def get_waiting_sessions(self) -> list[HeadlockSession]:
         """Get all sessions waiting for user input."""
-        return [s for s in self._sessions.values() if s.state == SessionState.WAITING]
+        return [self._slots[session_id].session for session_id in self._waiting]
+    
+    def session_count(self) -> int:
+        """Number of active sessions."""
+        return len(self._slots)
+    
+    def waiting_count(self) -> int:
+        """Number of sessions waiting for user input, without scanning them."""
+        return len(self._waiting)
+    
+    def get_session_info(self, session: HeadlockSession) -> dict:
+        """
+        Get the JSON-ready info for a session, as served to terminals.
+        Built from trusted in-process state without validation and cached until
+        the session next changes.
+        """
+        slot = self._slots.get(session.session_id)
+        if slot is not None and slot.info is not None:
+            return slot.info
+        
+        info = {
+            "session_id": session.session_id,
+            "state": session.state.value,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "agent_context": session.agent_context,
+            "last_response": session.last_response,
+        }
+        if slot is not None and slot.session is session:
+            slot.info = info
+        return info
     
     async def wait_for_instruction(self, session_id: str, timeout: Optional[float] = None) -> tuple[Optional[str], bool]:
         """
         Wait for an instruction from the terminal.
         Returns (instruction, should_terminate).
         """
-        session = self._sessions.get(session_id)
-        if not session:
-            return None, True
-        
-        event = self._instruction_events.get(session_id)
-        if not event:
+        slot = self._slots.get(session_id)
+        if not slot:
             return None, True
         
         try:
-            if timeout:
-                await asyncio.wait_for(event.wait(), timeout=timeout)
-            else:
-                await event.wait()
+            instruction, should_terminate = await asyncio.wait_for(slot.inbox.get(), timeout=timeout or None)
         except asyncio.TimeoutError:
             return None, False
         
-        # Get the instruction and reset
-        session = self._sessions.get(session_id)
-        if not session:
-            return None, True
-        
-        instruction = session.pending_instruction
-        should_terminate = session.state == SessionState.TERMINATED
-        
-        # Clear the event for next wait
-        event.clear()
-        session.pending_instruction = None
-        
+        # Removal and replacement deliver a termination, so a slot that hands
+        # out an instruction is still the live one.
         if not should_terminate:
-            session.state = SessionState.PROCESSING
-            session.updated_at = datetime.utcnow()
+            self._set_state(slot, SessionState.PROCESSING)
         
         return instruction, should_terminate
     
     def send_instruction(self, session_id: str, instruction: str) -> bool:
         """Send an instruction to a waiting AI agent."""
-        session = self._sessions.get(session_id)
-        if not session:
+        slot = self._slots.get(session_id)
+        if not slot:
             return False
         
-        session.pending_instruction = instruction
-        session.updated_at = datetime.utcnow()
-        
-        event = self._instruction_events.get(session_id)
-        if event:
-            event.set()
+        self._touch(slot)
+        self._deliver(slot, (instruction, False))
         
         return True
     
+    def send_instruction_checked(self, session_id: str, instruction: str) -> tuple[bool, Optional[str]]:
+        """
+        Send an instruction only if the session is waiting for one.
+        Returns (success, error) where error is "not_found" or "not_waiting".
+        """
+        slot = self._slots.get(session_id)
+        if not slot:
+            return False, "not_found"
+        if slot.session.state != SessionState.WAITING:
+            return False, "not_waiting"
+        
+        self._touch(slot)
+        self._deliver(slot, (instruction, False))
+        return True, None
+    
     def tap_out(self, session_id: str) -> bool:
         """Signal the AI to terminate the session."""
-        session = self._sessions.get(session_id)
-        if not session:
+        slot = self._slots.get(session_id)
+        if not slot:
             return False
         
-        session.state = SessionState.TERMINATED
-        session.updated_at = datetime.utcnow()
+        self._set_state(slot, SessionState.TERMINATED)
         
-        event = self._instruction_events.get(session_id)
-        if event:
-            event.set()
+        self._deliver(slot, (None, True))
         
         return True
     
     def update_context(self, session_id: str, context: str) -> bool:
         """Update the context/response from the AI agent."""
-        session = self._sessions.get(session_id)
-        if not session:
+        slot = self._slots.get(session_id)
+        if not slot:
             return False
         
-        session.agent_context = context
-        session.last_response = context
-        session.state = SessionState.WAITING
-        session.updated_at = datetime.utcnow()
+        slot.session.agent_context = context
+        slot.session.last_response = context
+        self._set_state(slot, SessionState.WAITING)
         return True
     
     def complete_session(self, session_id: str) -> bool:
         """Mark a session as completed."""
-        session = self._sessions.get(session_id)
-        if not session:
+        slot = self._slots.get(session_id)
+        if not slot:
             return False
         
-        session.state = SessionState.COMPLETED
-        session.updated_at = datetime.utcnow()
+        self._set_state(slot, SessionState.COMPLETED)
         return True
     
     def remove_session(self, session_id: str) -> bool:
         """Remove a session."""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
-            if session_id in self._instruction_events:
-                del self._instruction_events[session_id]
-            return True
-        return False
+        slot = self._slots.pop(session_id, None)
+        if slot is None:
+            return False
+        
+        # Anyone still holding the session sees it as terminated, and an agent
+        # waiting on it is woken so it exits instead of lingering until timeout
+        slot.session.state = SessionState.TERMINATED
+        self._deliver(slot, (None, True))
+        del self._sorted_ids[bisect.bisect_left(self._sorted_ids, session_id)]
+        self._waiting.pop(session_id, None)
+        self.revision += 1
+        return True
     
     def register_broadcast_callback(self, callback):
         """Register a callback for broadcasting updates."""
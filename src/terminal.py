@@ -2,14 +2,14 @@
 """Interactive terminal client for Headlock MCP server."""
 
 import asyncio
-import json
+from collections import deque
 import sys
-from datetime import datetime
+import time
 from typing import Optional
 
 import click
 import httpx
-import websockets
+from websockets.asyncio.client import connect as websocket_connect
 from rich.console import Console
 from rich.live import Live
 from rich.panel import Panel
@@ -22,11 +22,81 @@ from textual.containers import Vertical, Horizontal, VerticalScroll
 from textual.widgets import Header, Footer, TextArea, Static, Button, DataTable, Label
 from textual import events
 from textual.binding import Binding
+from textual.timer import Timer
+
+from . import _json
+
+try:
+    import uvloop
+except ImportError:  # uvloop is an optional speedup (unavailable on Windows)
+    uvloop = None
 
 console = Console()
 
 DEFAULT_SERVER_URL = "http://localhost:8765"
 
+# Sessions table columns and the colour-coded label for each session state
+SESSION_COLUMNS = ("ID", "State", "Context")
+STATE_LABELS = {
+    "waiting": "🟢 WAITING",
+    "processing": "🟡 PROCESSING",
+    "completed": "🔵 COMPLETED",
+    "terminated": "🔴 TERMINATED",
+}
+
+# Websocket events that change the sessions list, with the notice shown for each
+SESSION_EVENT_NOTICES = {
+    "session_waiting": "🎯 New session waiting: {short_id}",
+    "task_completed": "✅ Task completed in session: {short_id}",
+    "session_terminated": None,
+    "session_removed": "🗑️  Session removed: {short_id}",
+    "instruction_sent": "📤 Instruction sent to AI agent",
+}
+
+# Window in which websocket change events share one sessions refresh
+REFRESH_DEBOUNCE_S = 0.05
+
+# Output messages kept for display
+MAX_MESSAGES = 50
+
+# Interval at which new output messages are drawn
+OUTPUT_FLUSH_S = 0.033
+
+# Shown in the output area by F1
+HELP_TEXT = """
+🎯 Headlock Terminal Help
+
+📋 Sessions Sidebar:
+  • Click on any session to select it
+  • Green = Waiting, Yellow = Processing, Blue = Completed, Red = Terminated
+
+⌨️  Keyboard Shortcuts:
+  • Ctrl+J: Submit instruction
+  • Ctrl+R: Refresh sessions
+  • Ctrl+T: Tap out current session
+  • F1: Show this help
+  • Ctrl+C: Quit
+
+📝 Instruction Input:
+  • Type your instruction in the text area
+  • Enter creates new lines (like a code editor)
+  • Ctrl+J sends the instruction
+  • Works great over SSH!
+
+💡 Tips:
+  • Multi-line instructions work perfectly
+  • Rich formatting in output area
+  • Real-time session updates
+"""
+
+# Delay before reconnecting a dropped websocket, doubling up to the cap
+WS_RECONNECT_MIN_S = 0.1
+WS_RECONNECT_MAX_S = 5.0
+
+# One warm keep-alive pool for every request the terminal makes
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=30)
+
 
 class HeadlockTerminalApp(App):
     """Full-featured Textual terminal app for Headlock MCP server."""
@@ -82,12 +152,40 @@ class HeadlockTerminalApp(App):
     def __init__(self, server_url: str = DEFAULT_SERVER_URL):
         super().__init__()
         self.server_url = server_url.rstrip("/")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self._client: Optional[httpx.AsyncClient] = None
         self.current_session: Optional[str] = None
         self.sessions = []
         self.instruction_text = ""
-        self.messages = []  # Store messages for output display
+        self.messages = deque(maxlen=MAX_MESSAGES)  # Recent messages for output display
+        self.output_text = ""  # self.messages joined by newlines, as displayed
+        self.output_dirty = False  # Messages changed since the output was last drawn
+        self.clock_second = -1  # Epoch second clock_text was formatted for
+        self.clock_text = ""  # HH:MM:SS prefix for messages logged in clock_second
+        self.sessions_table: Optional[DataTable] = None  # Set on mount
+        self.output_display: Optional[Static] = None  # Set on mount
+        self.column_keys = []  # Sessions table column keys, in SESSION_COLUMNS order
+        self.table_rows: dict[str, tuple] = {}  # session_id -> row currently shown
         self.websocket_task: Optional[asyncio.Task] = None
+        self.poll_timer: Optional[Timer] = None  # Auto-refresh, paused while the websocket is up
+        self.refresh_timer: Optional[Timer] = None  # Pending schedule_refresh, if any
+        self.inflight: dict[str, asyncio.Future] = {}  # path -> in-flight GET, see get_content
+        self.refetch: set[str] = set()  # In-flight paths a fresh caller needs fetched again
+        self.sessions_digest: Optional[int] = None  # Hash of the /sessions body last shown
+        # At most one instruct and one tap-out request in flight at a time
+        self.instruct_lock = asyncio.Lock()
+        self.tap_out_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, created on first use."""
+        if self._client is None:
+            # Pool limits and HTTP/2 live on the transport, which also retries
+            # a failed connection attempt once.
+            self._client = httpx.AsyncClient(
+                timeout=_HTTP_TIMEOUT,
+                transport=httpx.AsyncHTTPTransport(http2=True, limits=_HTTP_LIMITS, retries=1),
+            )
+        return self._client
 
     def compose(self) -> ComposeResult:
         """Create the UI layout."""
@@ -129,15 +227,29 @@ class HeadlockTerminalApp(App):
 
     async def on_mount(self) -> None:
         """Initialize the app."""
+        # Look up the widgets updated on every refresh and message just once
+        self.sessions_table = table = self.query_one("#sessions-table", DataTable)
+        self.output_display = self.query_one("#output-display", Static)
+
         # Set up the sessions table
-        table = self.query_one("#sessions-table", DataTable)
-        table.add_columns("ID", "State", "Context")
+        self.column_keys = table.add_columns(*SESSION_COLUMNS)
         table.cursor_type = "row"
 
+        # Draw new output messages at up to ~30 frames per second
+        self.set_interval(OUTPUT_FLUSH_S, self.flush_output)
+
         # Show initial status
         self.show_message("🚀 Headlock Terminal started")
         self.show_message(f"📡 Connecting to {self.server_url}")
 
+        # Start auto-refresh timer (every 5 seconds); paused while the
+        # websocket is pushing updates
+        self.poll_timer = self.set_interval(5.0, self.auto_refresh_sessions)
+
+        # Start WebSocket connection for real-time updates, connecting while
+        # the health check and first load below are in flight
+        self.websocket_task = asyncio.create_task(self.websocket_listener())
+
         # Check server health
         if not await self.check_health():
             self.show_message("❌ Cannot connect to server. Make sure it's running.")
@@ -148,11 +260,13 @@ class HeadlockTerminalApp(App):
         
         self.update_status_bar()
 
-        # Start auto-refresh timer (every 5 seconds)
-        self.set_interval(5.0, self.auto_refresh_sessions)
-
-        # Start WebSocket connection for real-time updates
-        self.websocket_task = asyncio.create_task(self.websocket_listener())
+    async def on_unmount(self) -> None:
+        """Release pooled connections on shutdown."""
+        if self.websocket_task is not None:
+            self.websocket_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def check_health(self) -> bool:
         """Check if the server is running."""
@@ -162,66 +276,131 @@ class HeadlockTerminalApp(App):
         except Exception:
             return False
 
+    async def get_content(self, path: str, fresh: bool = False) -> bytes:
+        """
+        GET a server path and return the raw body.
+        Concurrent calls for the same path share one in-flight request. A fresh
+        caller, reacting to a change, needs a response read after it asked, so
+        joining a request already in flight makes that request fetch once more.
+        """
+        request = self.inflight.get(path)
+        # A finished request stays registered until its done callback runs on
+        # a later loop step; its body is old, so it counts as not in flight
+        if request is None or request.done():
+            request = asyncio.ensure_future(self._fetch_content(path))
+            self.inflight[path] = request
+            request.add_done_callback(lambda done: self._clear_inflight(path, done))
+        elif fresh:
+            self.refetch.add(path)
+        # Shielded so one caller giving up doesn't cancel the request for the rest
+        return await asyncio.shield(request)
+
+    def _clear_inflight(self, path: str, request: asyncio.Future) -> None:
+        # Leave a newer request that replaced this one registered
+        if self.inflight.get(path) is request:
+            del self.inflight[path]
+
+    async def _fetch_content(self, path: str) -> bytes:
+        while True:
+            self.refetch.discard(path)
+            response = await self.client.get(f"{self.server_url}{path}")
+            response.raise_for_status()
+            if path not in self.refetch:
+                return response.content
+
+    async def load_sessions(self, fresh: bool = False) -> None:
+        """Fetch the sessions list, updating the table only if the list changed."""
+        content = await self.get_content("/sessions", fresh=fresh)
+        digest = hash(content)
+        if digest == self.sessions_digest:
+            return
+        self.sessions = _json.loads(content)
+        await self.update_sessions_table()
+        self.sessions_digest = digest
+
     async def refresh_sessions(self) -> None:
         """Refresh the sessions list."""
         try:
-            response = await self.client.get(f"{self.server_url}/sessions")
-            response.raise_for_status()
-            self.sessions = response.json()
-            await self.update_sessions_table()
+            await self.load_sessions(fresh=True)
         except Exception as e:
             self.show_message(f"❌ Error loading sessions: {e}")
 
+    def schedule_refresh(self) -> None:
+        """Refresh sessions shortly, folding a burst of change events into one fetch."""
+        if self.refresh_timer is None:
+            self.refresh_timer = self.set_timer(REFRESH_DEBOUNCE_S, self._scheduled_refresh)
+
+    async def _scheduled_refresh(self) -> None:
+        self.refresh_timer = None
+        await self.refresh_sessions()
+
     async def auto_refresh_sessions(self) -> None:
         """Auto-refresh sessions silently."""
         try:
-            response = await self.client.get(f"{self.server_url}/sessions")
-            response.raise_for_status()
-            self.sessions = response.json()
-            await self.update_sessions_table()
+            await self.load_sessions()
         except Exception:
             # Don't show error messages for auto-refresh to avoid spam
             pass
 
     async def websocket_listener(self) -> None:
-        """Listen for real-time updates via WebSocket."""
+        """Listen for real-time updates via WebSocket, reconnecting when the connection drops."""
         ws_url = self.server_url.replace("http", "ws") + "/ws"
+        backoff = WS_RECONNECT_MIN_S
+        connected_before = False
         
-        try:
-            async with websockets.connect(ws_url) as websocket:
-                self.show_message("🔗 Connected to real-time updates")
-                
-                async for message in websocket:
-                    try:
-                        data = json.loads(message)
-                        event_type = data.get("type")
-                        
-                        if event_type in ["session_waiting", "task_completed", "session_terminated", "instruction_sent"]:
-                            # Refresh sessions when something changes
-                            await self.refresh_sessions()
+        while True:
+            try:
+                # Events are small JSON frames, so per-message deflate would
+                # cost more than it saves
+                async with websocket_connect(
+                    ws_url, compression=None, ping_interval=20, ping_timeout=20
+                ) as websocket:
+                    backoff = WS_RECONNECT_MIN_S
+                    if self.poll_timer is not None:
+                        self.poll_timer.pause()
+                    if connected_before:
+                        self.show_message("🔗 Reconnected to real-time updates")
+                    else:
+                        self.show_message("🔗 Connected to real-time updates")
+                    connected_before = True
+                    # Polling is paused from here on, so load whatever changed
+                    # before the socket was up: sessions missed while
+                    # disconnected, or created before the first connect (which
+                    # may race or outlive a failed startup health check)
+                    self.schedule_refresh()
+                    
+                    async for message in websocket:
+                        try:
+                            data = _json.loads(message)
+                            event_type = data.get("type")
                             
-                            # Show relevant messages
-                            if event_type == "session_waiting":
-                                session_id = data.get("session_id", "")[:8]
-                                self.show_message(f"🎯 New session waiting: {session_id}")
-                            elif event_type == "task_completed":
-                                session_id = data.get("session_id", "")[:8]
-                                self.show_message(f"✅ Task completed in session: {session_id}")
-                            elif event_type == "instruction_sent":
-                                self.show_message("📤 Instruction sent to AI agent")
+                            if event_type in SESSION_EVENT_NOTICES:
+                                # Refresh sessions when something changes
+                                self.schedule_refresh()
                                 
-                    except json.JSONDecodeError:
-                        continue
-                        
-        except Exception as e:
-            # WebSocket connection failed, fall back to polling
-            self.show_message("⚠️  Real-time updates unavailable, using auto-refresh")
+                                # Show relevant messages
+                                notice = SESSION_EVENT_NOTICES[event_type]
+                                if notice:
+                                    self.show_message(notice.format(short_id=data.get("session_id", "")[:8]))
+                                    
+                        except _json.JSONDecodeError:
+                            continue
+                            
+            except Exception:
+                # WebSocket connection failed, fall back to polling until it's back
+                if backoff == WS_RECONNECT_MIN_S:
+                    self.show_message("⚠️  Real-time updates unavailable, using auto-refresh")
+            
+            if self.poll_timer is not None:
+                self.poll_timer.resume()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WS_RECONNECT_MAX_S)
 
     async def update_sessions_table(self) -> None:
         """Update the sessions table display."""
-        table = self.query_one("#sessions-table", DataTable)
-        table.clear()
+        table = self.sessions_table
 
+        rows = {}
         for session in self.sessions:
             session_id = session.get("session_id", "")
             state = session.get("state", "unknown")
@@ -229,28 +408,51 @@ class HeadlockTerminalApp(App):
             if len(context) > 30:
                 context = context[:27] + "..."
 
-            # Color coding for states
-            state_display = {
-                "waiting": "🟢 WAITING",
-                "processing": "🟡 PROCESSING",
-                "completed": "🔵 COMPLETED",
-                "terminated": "🔴 TERMINATED",
-            }.get(state, f"⚪ {state.upper()}")
-
-            table.add_row(session_id[:12], state_display, context, key=session_id)
+            state_display = STATE_LABELS.get(state) or f"⚪ {state.upper()}"
+
+            rows[session_id] = (session_id[:12], state_display, context)
+
+        # Patch the table against what it already shows instead of clearing
+        # it, so unchanged rows (and the cursor) stay put
+        for session_id in self.table_rows.keys() - rows.keys():
+            table.remove_row(session_id)
+        for session_id, row in rows.items():
+            shown = self.table_rows.get(session_id)
+            if shown is None:
+                table.add_row(*row, key=session_id)
+            elif shown != row:
+                # Only the cells that changed are redrawn
+                for column_key, old, new in zip(self.column_keys, shown, row):
+                    if old != new:
+                        table.update_cell(session_id, column_key, new, update_width=True)
+        self.table_rows = rows
 
     def show_message(self, message: str) -> None:
         """Show a message in the output area."""
-        current_time = datetime.now().strftime("%H:%M:%S")
-        self.messages.append(f"[{current_time}] {message}")
+        # Messages arriving within the same second share one formatted timestamp
+        now = int(time.time())
+        if now != self.clock_second:
+            self.clock_second = now
+            self.clock_text = time.strftime("%H:%M:%S", time.localtime(now))
+        line = f"[{self.clock_text}] {message}"
+
+        # Only the last MAX_MESSAGES are kept; older ones fall off the deque.
+        # The displayed text is kept in step by trimming the evicted line from
+        # its front and appending the new one, rather than re-joining them all.
+        if len(self.messages) == self.messages.maxlen:
+            self.output_text = self.output_text[len(self.messages[0]) + 1:]
+        self.messages.append(line)
+        self.output_text = f"{self.output_text}\n{line}" if self.output_text else line
         
-        # Keep only the last 50 messages to avoid memory issues
-        if len(self.messages) > 50:
-            self.messages = self.messages[-50:]
-        
-        # Update the display
-        output = self.query_one("#output-display", Static)
-        output.update("\n".join(self.messages))
+        # The display is redrawn by flush_output, at most once per frame
+        self.output_dirty = True
+
+    def flush_output(self) -> None:
+        """Redraw the output area if messages arrived since the last frame."""
+        if not self.output_dirty:
+            return
+        self.output_dirty = False
+        self.output_display.update(self.output_text)
 
     async def action_submit_instruction(self) -> None:
         """Submit the current instruction."""
@@ -265,16 +467,23 @@ class HeadlockTerminalApp(App):
             self.show_message("❌ Instruction is empty")
             return
 
+        if self.instruct_lock.locked():
+            self.show_message("⏳ Still sending the previous instruction")
+            return
+
+        session_id = self.current_session
         try:
-            response = await self.client.post(
-                f"{self.server_url}/sessions/{self.current_session}/instruct",
-                json={"instruction": instruction}
-            )
+            async with self.instruct_lock:
+                response = await self.client.post(
+                    f"{self.server_url}/sessions/{session_id}/instruct",
+                    content=_json.dumps({"instruction": instruction}),
+                    headers={"Content-Type": "application/json"},
+                )
             response.raise_for_status()
-            result = response.json()
+            result = _json.loads(response.content)
 
             if result.get("success", False):
-                self.show_message(f"✅ Instruction sent to session {self.current_session[:8]}")
+                self.show_message(f"✅ Instruction sent to session {session_id[:8]}")
                 textarea.text = ""  # Clear the input
             else:
                 self.show_message("❌ Failed to send instruction")
@@ -294,16 +503,23 @@ class HeadlockTerminalApp(App):
             self.show_message("❌ No session selected. Click on a session in the sidebar first.")
             return
 
+        if self.tap_out_lock.locked():
+            self.show_message("⏳ Tap-out already in progress")
+            return
+
+        session_id = self.current_session
         try:
-            response = await self.client.post(
-                f"{self.server_url}/sessions/{self.current_session}/tap-out"
-            )
+            async with self.tap_out_lock:
+                response = await self.client.post(
+                    f"{self.server_url}/sessions/{session_id}/tap-out"
+                )
             response.raise_for_status()
-            result = response.json()
+            result = _json.loads(response.content)
 
             if result.get("success", False):
-                self.show_message(f"✅ Tapped out of session {self.current_session[:8]}")
-                self.current_session = None
+                self.show_message(f"✅ Tapped out of session {session_id[:8]}")
+                if self.current_session == session_id:
+                    self.current_session = None
                 self.update_status_bar()
                 await self.refresh_sessions()  # Refresh to update the session list
             else:
@@ -314,35 +530,11 @@ class HeadlockTerminalApp(App):
 
     def action_show_help(self) -> None:
         """Show help information."""
-        help_text = """
-🎯 Headlock Terminal Help
-
-📋 Sessions Sidebar:
-  • Click on any session to select it
-  • Green = Waiting, Yellow = Processing, Blue = Completed, Red = Terminated
-
-⌨️  Keyboard Shortcuts:
-  • Ctrl+J: Submit instruction
-  • Ctrl+R: Refresh sessions
-  • Ctrl+T: Tap out current session
-  • F1: Show this help
-  • Ctrl+C: Quit
-
-📝 Instruction Input:
-  • Type your instruction in the text area
-  • Enter creates new lines (like a code editor)
-  • Ctrl+J sends the instruction
-  • Works great over SSH!
-
-💡 Tips:
-  • Multi-line instructions work perfectly
-  • Rich formatting in output area
-  • Real-time session updates
-        """
         # Clear messages and show help
-        self.messages = []
-        output = self.query_one("#output-display", Static)
-        output.update(help_text)
+        self.messages.clear()
+        self.output_text = ""
+        self.output_dirty = False
+        self.output_display.update(HELP_TEXT)
 
     async def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle session selection."""
@@ -372,11 +564,6 @@ class HeadlockTerminal:
         """Run the interactive terminal."""
         app = HeadlockTerminalApp(self.server_url)
         await app.run_async()
-    
-    async def run_interactive(self):
-        """Run the interactive terminal."""
-        app = HeadlockTerminalApp(self.server_url)
-        await app.run_async()
 
 
 @click.command()
@@ -395,7 +582,11 @@ def main(server: str, textual: bool):
     """Interactive terminal for Headlock MCP server."""
     if textual:
         terminal = HeadlockTerminal(server_url=server)
-        asyncio.run(terminal.run_interactive())
+        # The app's polling, websocket and timers all run on this loop
+        if uvloop is not None:
+            uvloop.run(terminal.run_interactive())
+        else:
+            asyncio.run(terminal.run_interactive())
     else:
         # Fallback to simple console mode if needed
         console.print("[yellow]Simple mode not implemented yet. Use --textual flag.[/yellow]")
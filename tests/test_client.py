@@ -0,0 +1,124 @@
+"""Tests for the headlock MCP client."""
+
+import asyncio
+import json
+
+import pytest
+from mcp.types import CallToolResult, TextContent
+
+from src.client import AsyncHeadlockClient, HeadlockResponse, _parse_mcp_result
+
+
+PAYLOAD = {"session_id": "abc", "instruction": "do it", "should_terminate": False}
+
+
+def wrapped_result(payload: dict) -> CallToolResult:
+    """A tool result as FastMCP returns a tool's JSON string."""
+    text = json.dumps(payload)
+    return CallToolResult(
+        content=[TextContent(type="text", text=text)],
+        structuredContent={"result": text},
+    )
+
+
+def error_result() -> CallToolResult:
+    return CallToolResult(
+        content=[TextContent(type="text", text="Error executing tool: Session not found")],
+        isError=True,
+    )
+
+
+def test_parse_mcp_result_unwraps_result_payload():
+    assert _parse_mcp_result(wrapped_result(PAYLOAD)) == PAYLOAD
+
+
+def test_parse_mcp_result_unwraps_text_only_result():
+    text = json.dumps({"result": json.dumps(PAYLOAD)})
+    result = CallToolResult(content=[TextContent(type="text", text=text)])
+    assert _parse_mcp_result(result) == PAYLOAD
+
+
+def test_error_result_does_not_select_parser():
+    client = AsyncHeadlockClient()
+
+    with pytest.raises(RuntimeError, match="Session not found"):
+        client._parse(error_result())
+    assert client._parser is None
+
+    # A valid result after the error still parses
+    assert client._parse(wrapped_result(PAYLOAD)) == PAYLOAD
+
+
+def test_cached_parser_rejects_payload_without_session_id():
+    client = AsyncHeadlockClient()
+    assert client._parse(wrapped_result(PAYLOAD)) == PAYLOAD
+
+    # A different shape falls back to reselecting instead of trusting the cache
+    structured = CallToolResult(content=[], structuredContent=PAYLOAD)
+    assert client._parse(structured) == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_stale_failure_keeps_newer_session():
+    client = AsyncHeadlockClient()
+    stale = asyncio.ensure_future(asyncio.sleep(0))
+    current = asyncio.ensure_future(asyncio.sleep(0))
+    await asyncio.gather(stale, current)
+    client._session_task = current
+    client._session_future = asyncio.get_running_loop().create_future()
+    client._session_closed = asyncio.Event()
+
+    await client._drop_session(stale)
+    assert client._session_task is current
+
+    await client._drop_session(current)
+    assert client._session_task is None
+    assert client._session_future is None
+
+
+class ScriptedClient(AsyncHeadlockClient):
+    """Replays canned responses and records the context sent with each call."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = iter(responses)
+        self.contexts = []
+
+    async def enter_headlock(self, session_id=None, context=None):
+        self.contexts.append(context)
+        return next(self.responses)
+
+    async def continue_headlock(self, session_id, context=None):
+        self.contexts.append(context)
+        return next(self.responses)
+
+
+@pytest.mark.asyncio
+async def test_iter_instructions_carries_context_forward():
+    client = ScriptedClient([
+        HeadlockResponse("s1", instruction="first"),
+        HeadlockResponse("s1"),  # The server's wait timed out
+        HeadlockResponse("s1", instruction="second"),
+        HeadlockResponse("s1", instruction="third"),
+        HeadlockResponse("s1", should_terminate=True),
+    ])
+
+    seen = []
+    async for instruction, report in client.iter_instructions(context="ready"):
+        seen.append(instruction)
+        if instruction != "second":  # "second" is never reported
+            report(f"did {instruction}")
+
+    assert seen == ["first", "second", "third"]
+    assert client.contexts == ["ready", "did first", "did first", "did first", "did third"]
+
+
+@pytest.mark.asyncio
+async def test_iter_instructions_resends_initial_context_before_any_report():
+    client = ScriptedClient([
+        HeadlockResponse("s1"),
+        HeadlockResponse("s1", should_terminate=True),
+    ])
+
+    assert [item async for item in client.iter_instructions(context="ready")] == []
+    assert client.contexts == ["ready", "ready"]
@@ -0,0 +1,121 @@
+"""Tests for the session manager's delivery and lookup indexes."""
+
+import asyncio
+
+import pytest
+
+from src.models import SessionState
+from src.session_manager import SessionManager
+
+
+def assert_waiting_in_step(manager: SessionManager) -> None:
+    waiting = manager.get_waiting_sessions()
+    assert manager.waiting_count() == len(waiting)
+    assert all(session.state == SessionState.WAITING for session in waiting)
+    assert {session.session_id for session in waiting} == {
+        session.session_id
+        for session in manager.get_all_sessions()
+        if session.state == SessionState.WAITING
+    }
+
+
+async def park(manager: SessionManager, session_id: str) -> asyncio.Task:
+    """Start an agent waiting on a session and let it block on the inbox."""
+    task = asyncio.create_task(manager.wait_for_instruction(session_id, timeout=5))
+    await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+@pytest.mark.asyncio
+async def test_termination_is_not_overwritten_by_instruction():
+    manager = SessionManager()
+    manager.create_session("s1")
+
+    assert manager.tap_out("s1")
+    manager.send_instruction("s1", "do it")
+
+    assert await manager.wait_for_instruction("s1", timeout=1) == (None, True)
+
+
+@pytest.mark.asyncio
+async def test_termination_replaces_undelivered_instruction():
+    manager = SessionManager()
+    manager.create_session("s1")
+
+    manager.send_instruction("s1", "do it")
+    manager.tap_out("s1")
+
+    assert await manager.wait_for_instruction("s1", timeout=1) == (None, True)
+
+
+@pytest.mark.asyncio
+async def test_remove_session_wakes_waiter():
+    manager = SessionManager()
+    manager.create_session("s1")
+    waiter = await park(manager, "s1")
+
+    assert manager.remove_session("s1")
+
+    assert await asyncio.wait_for(waiter, 1) == (None, True)
+    assert manager.get_session("s1") is None
+    assert_waiting_in_step(manager)
+
+
+@pytest.mark.asyncio
+async def test_replacing_session_wakes_waiter_on_old_one():
+    manager = SessionManager()
+    old = manager.create_session("s1", context="old")
+    waiter = await park(manager, "s1")
+
+    new = manager.create_session("s1", context="new")
+
+    assert await asyncio.wait_for(waiter, 1) == (None, True)
+    assert manager.get_session("s1") is new is not old
+    assert manager.session_count() == 1
+    assert_waiting_in_step(manager)
+
+    # The replacement delivers to its own waiter
+    manager.send_instruction("s1", "do it")
+    assert await manager.wait_for_instruction("s1", timeout=1) == ("do it", False)
+
+
+def test_find_sessions_by_prefix():
+    manager = SessionManager()
+    for session_id in ("ab2", "b", "ab1", "a", "abc"):
+        manager.create_session(session_id)
+
+    assert [s.session_id for s in manager.find_sessions("ab")] == ["ab1", "ab2", "abc"]
+    assert [s.session_id for s in manager.find_sessions("")] == ["a", "ab1", "ab2", "abc", "b"]
+    assert manager.find_sessions("zz") == []
+
+    manager.remove_session("ab2")
+    manager.create_session("ab1")  # Replacing doesn't duplicate the index entry
+    assert [s.session_id for s in manager.find_sessions("ab")] == ["ab1", "abc"]
+
+
+@pytest.mark.asyncio
+async def test_waiting_count_tracks_state_changes():
+    manager = SessionManager()
+    for session_id in ("s1", "s2", "s3"):
+        manager.create_session(session_id)
+    assert manager.waiting_count() == 3
+    assert_waiting_in_step(manager)
+
+    manager.send_instruction("s1", "do it")
+    assert await manager.wait_for_instruction("s1", timeout=1) == ("do it", False)
+    assert manager.get_session("s1").state == SessionState.PROCESSING
+    assert_waiting_in_step(manager)
+
+    manager.update_context("s1", "done")
+    assert_waiting_in_step(manager)
+
+    manager.complete_session("s2")
+    manager.tap_out("s3")
+    assert manager.waiting_count() == 1
+    assert_waiting_in_step(manager)
+
+    manager.remove_session("s1")
+    manager.create_session("s2")  # Replacing a completed session starts it waiting again
+    assert [s.session_id for s in manager.get_waiting_sessions()] == ["s2"]
+    assert_waiting_in_step(manager)